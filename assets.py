@@ -0,0 +1,54 @@
+import os
+import pygame
+from picture import Picture  # used for the images of the game
+
+# directory of the game files, the assets are found in it whatever the current
+# working directory is
+ASSET_DIR = os.path.dirname(os.path.realpath(__file__))
+
+
+# Class used for loading the images and the music of the game from the disk once
+# and serving the loaded handles afterwards
+class AssetManager:
+    # Constructor that creates an asset manager for the files in the given directory
+    def __init__(self, directory=ASSET_DIR):
+        self.directory = directory
+        self.pictures = {}  # loaded pictures by their file names
+        # music file loaded into the mixer of pygame and whether it is paused
+        self.music = None
+        self.music_paused = False
+
+    # Returns the path of the asset with the given file name
+    def path(self, name):
+        return os.path.join(self.directory, name)
+
+    # Returns the picture of the image with the given file name, which is loaded
+    # and converted to the pixel format of the window the first time
+    def picture(self, name):
+        picture = self.pictures.get(name)
+        if picture is None:
+            picture = Picture(self.path(name))
+            picture.convert()
+            self.pictures[name] = picture
+        return picture
+
+    # Plays the music with the given file name repeatedly in the background. It is
+    # loaded the first time, then the paused music is resumed where it was left
+    def play_music(self, name, volume):
+        if self.music != name:
+            # Initializes the mixer of pygame only when the music is needed
+            if not pygame.mixer.get_init():
+                pygame.mixer.init()
+            pygame.mixer.music.load(self.path(name))
+            self.music = name
+            pygame.mixer.music.play(-1)
+        elif self.music_paused:
+            pygame.mixer.music.unpause()
+        pygame.mixer.music.set_volume(volume)
+        self.music_paused = False
+
+    # Pauses the music if any music is playing
+    def pause_music(self):
+        if self.music is not None and not self.music_paused:
+            pygame.mixer.music.pause()
+            self.music_paused = True
@@ -0,0 +1,111 @@
+import numpy as np  # fundamental Python module for scientific computing
+from board import merge_cascade  # merges the tiles of all the columns of the boards
+
+
+# Class used for advancing many games in lockstep. The boards of all the games
+# are kept as tile exponents (0 means empty, as in ExponentBoard) in a single
+# (N, grid_h, grid_w) array and each game rule is applied to all the boards at
+# once, giving the same boards and scores as settling each board with Engine
+class BatchGrid:
+    # Constructor that creates the given number of empty boards
+    def __init__(self, num_boards, grid_h=20, grid_w=12):
+        self.num_boards = num_boards
+        self.grid_height = grid_h
+        self.grid_width = grid_w
+        # cells[n, row, col] keeps the exponent of the tile on the cell of board n
+        self.cells = np.zeros((num_boards, grid_h, grid_w), dtype=np.uint8)
+        # total score and game_over flag of each game
+        self.scores = np.zeros(num_boards, dtype=np.int64)
+        self.game_over = np.zeros(num_boards, dtype=bool)
+        # boards whose games were not over before the last placement, the rules
+        # are applied to them only (as Engine still settles the placement which
+        # ends its game and stops afterwards)
+        self.playing = np.ones(num_boards, dtype=bool)
+
+    # Places the tiles of a stopped tetromino onto each board. tiles has the shape
+    # (N, k, 3) and keeps (x, y, number) for k tiles of each board, a tile with
+    # number 0 is skipped. The game of a board is over if any of its tiles is out
+    # of the board, the tiles of the boards whose games are already over are
+    # skipped. Returns the game_over flags
+    def place(self, tiles):
+        tiles = np.asarray(tiles, dtype=np.int64)
+        x, y, number = tiles[..., 0], tiles[..., 1], tiles[..., 2]
+        self.playing = ~self.game_over
+        present = (number > 0) & self.playing[:, None]
+        inside = present & (x >= 0) & (x < self.grid_width) & (y >= 0) & (y < self.grid_height)
+        self.game_over |= (present & ~inside).any(axis=1)
+        boards = np.broadcast_to(np.arange(self.num_boards)[:, None], x.shape)
+        self.cells[boards[inside], y[inside], x[inside]] = np.log2(number[inside]).astype(np.uint8)
+        return self.game_over
+
+    # Applies the rules after the tetrominoes are placed (see engine.settle):
+    # merges the tiles, clears the full rows and drops the free tiles, repeating
+    # them until a round changes no board. The boards whose games were over
+    # before the last placement are left unchanged
+    def settle(self):
+        playing = self.playing
+        while True:
+            # Merges available tiles until there is no tile to merge on any board
+            num_tiles = np.count_nonzero(self.cells)
+            cells = self.cells[playing]
+            self.scores[playing] += merge_cascade(cells)
+            self.cells[playing] = cells
+            changed = np.count_nonzero(self.cells) != num_tiles
+            # Removes the completely filled rows
+            num_rows, score = self.clear_full_rows()
+            self.scores += score
+            changed = changed or num_rows.any()
+            # Drops down free tiles until there is no tile to drop down on any board
+            free_tiles = self.find_free_tiles()
+            while free_tiles.any():
+                changed = True
+                self.move_free_tiles(free_tiles)
+                free_tiles = self.find_free_tiles()
+            if not changed:
+                return
+
+    # Checks each row of each board if it is completely filled with tiles
+    def is_full(self):
+        return (self.cells != 0).all(axis=2)
+
+    # Removes all completely filled rows of each board (whose game was not over
+    # before the last placement) by moving the remaining rows down in their order.
+    # Returns the number of removed rows and the score gained by each board
+    def clear_full_rows(self):
+        row_count = self.is_full() & self.playing[:, None]
+        num_rows = row_count.sum(axis=1)
+        if not num_rows.any():
+            return num_rows, np.zeros(self.num_boards, dtype=np.int64)
+        values = np.where(self.cells != 0, 1 << self.cells.astype(np.int64), 0)
+        score = (values.sum(axis=2) * row_count).sum(axis=1)
+        # stable sorting by the full flags keeps the remaining rows in order and
+        # puts the full rows to the top, where they are emptied
+        order = np.argsort(row_count, axis=1, kind="stable")
+        self.cells[:] = np.take_along_axis(self.cells, order[:, :, None], axis=1)
+        self.cells[np.take_along_axis(row_count, order, axis=1)] = 0
+        return num_rows, score
+
+    # Finds the tiles which are not connected to the bottommost row through the
+    # other tiles by spreading the support from the bottommost row to the
+    # neighboring tiles until it does not change (on the boards whose games were
+    # not over before the last placement)
+    def find_free_tiles(self):
+        occupied = self.cells != 0
+        supported = np.zeros_like(occupied)
+        supported[:, 0] = occupied[:, 0]
+        while True:
+            spread = supported.copy()
+            spread[:, 1:] |= supported[:, :-1]
+            spread[:, :-1] |= supported[:, 1:]
+            spread[:, :, 1:] |= supported[:, :, :-1]
+            spread[:, :, :-1] |= supported[:, :, 1:]
+            spread &= occupied
+            if (spread == supported).all():
+                return occupied & ~supported & self.playing[:, None, None]
+            supported = spread
+
+    # Sends the given free tiles of each board one unit down
+    def move_free_tiles(self, free_tiles):
+        moved = np.where(free_tiles, self.cells, 0)
+        self.cells[free_tiles] = 0
+        self.cells[:, :-1] |= moved[:, 1:]
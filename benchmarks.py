@@ -0,0 +1,126 @@
+'''
+Microbenchmarks for the hot paths of the game, run all of them or the given ones by
+python benchmarks.py [name ...]
+'''
+import sys
+import time
+import copy
+from point import Point
+from tile import Tile
+import stddraw
+from game_grid import GameGrid
+from engine import Engine
+from board import ExponentBoard
+
+
+# Returns the average time in microseconds taken by run(state), where a new
+# state is created by setup() before each run and is not timed
+def time_per_run(setup, run, repeat):
+    elapsed = 0
+    for i in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        run(state)
+        elapsed += time.perf_counter() - start
+    return elapsed / repeat * 1e6
+
+
+# Runs the given function and returns the number of points created meanwhile,
+# counted by wrapping the constructor of Point
+def count_points(function):
+    count = [0]
+    init = Point.__init__
+
+    def counting_init(self, *args):
+        count[0] += 1
+        init(self, *args)
+
+    Point.__init__ = counting_init
+    try:
+        function()
+    finally:
+        Point.__init__ = init
+    return count[0]
+
+
+# Compares the points created and the time taken per frame when the game screen
+# of a game with the given number of placements is drawn (GameGrid.draw) by
+# creating a tile and its position for each drawn tile (as before) and by
+# drawing the tiles from their exponents (Tile.draw_sprite)
+def positions(num_placements=30, num_frames=200):
+    stddraw.setCanvasSize(800, 800)
+    stddraw.setXscale(-0.5, 19.5)
+    stddraw.setYscale(-0.5, 19.5)
+    engine = Engine(20, 12, 0)
+    for i in range(num_placements):
+        engine.step("drop")
+    grid = GameGrid(20, 20, engine)
+    draw_sprite = Tile.__dict__["draw_sprite"]
+
+    # Draws the tile with the given exponent by creating a tile on its position
+    def draw_tile_object(x, y, exponent):
+        tile = Tile(Point(x, y), 1 << exponent)
+        draw_sprite.__func__(tile.position.x, tile.position.y, tile.exponent)
+
+    for name, drawer in (("tile objects", staticmethod(draw_tile_object)), ("exponents", draw_sprite)):
+        Tile.draw_sprite = drawer
+        try:
+            grid.draw()  # draws the pictures of the background and the tiles once
+            num_points = count_points(lambda: [grid.draw() for i in range(num_frames)])
+            start = time.perf_counter()
+            for i in range(num_frames):
+                grid.draw()
+            elapsed = time.perf_counter() - start
+        finally:
+            Tile.draw_sprite = draw_sprite
+        print("%-12s %6.1f points/frame %8.1f us/frame"
+              % (name, num_points / num_frames, elapsed / num_frames * 1e6))
+
+
+# Creates a board with a floating component of 10 tiles whose lowest row is 15
+# rows above the bottommost row, together with the same tiles as a matrix of
+# Tile objects as the game grid kept them before the engine
+def floating_component(grid_h=20, grid_w=12):
+    tiles = [(x, y, 2 if (x + y) % 2 else 4) for y in (15, 16) for x in range(3, 8)]
+    board = ExponentBoard(grid_h, grid_w)
+    board.place(tiles)
+    tile_matrix = [[None] * grid_w for row in range(grid_h)]
+    for x, y, number in tiles:
+        tile_matrix[y][x] = Tile(Point(x, y), number)
+    return board, tile_matrix
+
+
+# Drops all the tiles of the given tile matrix the given number of rows, one row
+# at a time. Each moving tile is either copied into the cell below it with
+# copy.deepcopy (as GameGrid.move_free_tiles did) or moved there by reference
+def drop_tile_matrix(tile_matrix, distance, by_copy):
+    for step in range(distance):
+        for row in range(1, len(tile_matrix)):
+            for col in range(len(tile_matrix[row])):
+                tile = tile_matrix[row][col]
+                if tile is not None:
+                    if by_copy:
+                        tile = copy.deepcopy(tile)
+                    tile_matrix[row - 1][col] = tile
+                    tile.move(0, -1)
+                    tile_matrix[row][col] = None
+
+
+# Compares the time taken by a cascade of 10 free tiles falling 15 rows when the
+# tiles are copied at each row of the fall (before), when they are moved by
+# reference, and when the engine drops them (ExponentBoard.drop_free_tiles)
+def cascade(repeat=2000):
+    runs = (("deepcopy", lambda state: drop_tile_matrix(state[1], 15, True)),
+            ("reference", lambda state: drop_tile_matrix(state[1], 15, False)),
+            ("engine", lambda state: state[0].drop_free_tiles()))
+    for name, run in runs:
+        print("%-10s %8.1f us/cascade" % (name, time_per_run(floating_component, run, repeat)))
+
+
+# benchmarks which can be run by their names
+BENCHMARKS = {"positions": positions, "cascade": cascade}
+
+if __name__ == "__main__":
+    for name in sys.argv[1:] or BENCHMARKS:
+        print("[" + name + "]")
+        BENCHMARKS[name]()
@@ -0,0 +1,382 @@
+import numpy as np  # fundamental Python module for scientific computing
+from labeling import connected_component_labeling  # 4-component labeling of the tiles
+
+
+# Returns the given boolean array of cells as a list of row bitmasks, where bit
+# col of a row is set if the cell in that column is True
+def row_masks(cells):
+    packed = np.packbits(np.atleast_2d(cells), axis=-1, bitorder="little")
+    return [int.from_bytes(row.tobytes(), "little") for row in packed]
+
+
+# Returns the given list of row bitmasks as a boolean array with grid_w columns
+def mask_rows(masks, grid_w):
+    num_bytes = (grid_w + 7) // 8
+    packed = np.array([list(mask.to_bytes(num_bytes, "little")) for mask in masks], dtype=np.uint8)
+    packed = packed.reshape(len(masks), num_bytes)
+    return np.unpackbits(packed, axis=1, count=grid_w, bitorder="little").astype(bool)
+
+
+# Returns the row bitmasks of the tiles which are connected to the bottommost row
+# through the other tiles, given the row bitmasks of the occupied cells. Support
+# spreads from the bottommost row to the rows above and below it, each time
+# filling the runs of occupied cells that contain the newly supported cells, so
+# each cell is visited a constant number of times
+def find_supported(occupied):
+    supported = [0] * len(occupied)
+    if not occupied:
+        return supported
+    supported[0] = occupied[0]
+    rows_to_visit = [0]
+    while rows_to_visit:
+        row = rows_to_visit.pop()
+        for next_row in (row - 1, row + 1):
+            if next_row < 0 or next_row >= len(occupied):
+                continue
+            seeds = supported[row] & occupied[next_row] & ~supported[next_row]
+            if not seeds:
+                continue
+            # fill the runs of occupied cells containing the seeds
+            while True:
+                grown = (seeds | (seeds << 1) | (seeds >> 1)) & occupied[next_row]
+                if grown == seeds:
+                    break
+                seeds = grown
+            supported[next_row] |= seeds
+            rows_to_visit.append(next_row)
+    return supported
+
+
+# Merges the tiles of all the columns until there is no tile to merge, giving the
+# same tiles and score as repeating the bottom to top merging passes of
+# ExponentBoard.check_merging. After the first pass only a newly merged tile can
+# merge again, with the tile below it, so the following passes are resolved by
+# following each merged tile downwards in the same sweep. cells keeps the tile
+# exponents of a board (rows, columns) or of many boards (N, rows, columns).
+# Returns the score gained by the merges (of each board)
+# If removed is given (a boolean array with the shape of cells) the cells of the
+# tiles removed by the merges are marked on it
+def merge_cascade(cells, removed=None):
+    score = np.zeros(cells.shape[:-2], dtype=np.int64)
+    for a in range(cells.shape[-2] - 1):
+        lower, upper = cells[..., a, :], cells[..., a + 1, :]
+        # columns where the tile in row a has an equal numbered tile above it
+        merging = (lower != 0) & (lower == upper)
+        row = a
+        while merging.any():
+            upper[merging] = 0
+            if removed is not None:
+                removed[..., row + 1, :] |= merging
+            lower[merging] += 1
+            score += np.where(merging, 1 << lower.astype(np.int64), 0).sum(axis=-1)
+            if row == 0:
+                break
+            # the merged tiles which are equal to the tile below them merge again
+            row -= 1
+            lower, upper = cells[..., row, :], cells[..., row + 1, :]
+            merging &= lower == upper
+    return score
+
+
+# Class used for keeping the tiles placed on the game grid as the exponents of
+# their numbers (log2 of the number, 0 means the cell is empty) in a contiguous
+# uint8 array, so that the game rules can work on whole rows at once
+class ExponentBoard:
+    # Constructor that creates an empty board with the given size
+    def __init__(self, grid_h, grid_w):
+        self.grid_height = grid_h
+        self.grid_width = grid_w
+        # cells[row, col] keeps the exponent of the tile on the cell, row 0 is the
+        # bottommost row of the game grid
+        self.cells = np.zeros((grid_h, grid_w), dtype=np.uint8)
+        # number of tiles and the bitmask of the occupied cells (bit col is set if
+        # the cell in column col is occupied) of each row, which are updated with
+        # each change on the cells so that the rows never need to be scanned
+        self.row_counts = np.zeros(grid_h, dtype=int)
+        self.occupancy = [0] * grid_h
+        # heights[col] is the number of rows up to the topmost tile in the column
+        # (0 if the column is empty), updated with each change on the cells. It is
+        # a read-only view of the array the board updates, so that the callers
+        # (e.g. bots reading the features of the board) cannot break it
+        self._heights = np.zeros(grid_w, dtype=int)
+        self.heights = self._heights.view()
+        self.heights.flags.writeable = False
+        # bitmask of a completely filled row
+        self.full_mask = (1 << grid_w) - 1
+
+    # Recomputes the row counts and bitmasks from the cells, needed only after the
+    # cells array is modified directly
+    def update_rows(self):
+        self.row_counts = np.count_nonzero(self.cells, axis=1)
+        self.occupancy = row_masks(self.cells != 0)
+        self.update_heights()
+
+    # Recomputes the heights of the given columns (a boolean array or a list of
+    # column indexes, all the columns if it is None) from the cells
+    def update_heights(self, columns=None):
+        if columns is None:
+            columns = slice(None)
+        occupied = self.cells[::-1, columns] != 0
+        self._heights[columns] = np.where(occupied.any(axis=0),
+                                         self.grid_height - occupied.argmax(axis=0), 0)
+
+    # Returns the number on the tile placed on the given cell (0 if it is empty)
+    def number(self, row, col):
+        exponent = int(self.cells[row, col])
+        return 1 << exponent if exponent else 0
+
+    # Returns the numbers on the tiles as a list of rows (0 means empty)
+    def numbers(self):
+        return [[1 << e if e else 0 for e in row] for row in self.cells.tolist()]
+
+    # Places the given (x, y, number) tiles onto the board. Returns False if any
+    # of them is out of the board, and True otherwise
+    def place(self, tiles):
+        inside = True
+        for x, y, number in tiles:
+            if self.is_inside(y, x):
+                if not self.cells[y, x]:
+                    self.row_counts[y] += 1
+                    self.occupancy[y] |= 1 << x
+                    self._heights[x] = max(self._heights[x], y + 1)
+                self.cells[y, x] = number.bit_length() - 1
+            else:
+                inside = False
+        return inside
+
+    # Removes all the tiles from the board
+    def clear(self):
+        self.cells.fill(0)
+        self.row_counts.fill(0)
+        self.occupancy = [0] * self.grid_height
+        self._heights.fill(0)
+
+    # Returns the number of the tiles placed on the board
+    def count_tiles(self):
+        return int(self.row_counts.sum())
+
+    # Removes the marked cells from the row counts, bitmasks and column heights
+    def remove_from_rows(self, removed):
+        for row in np.flatnonzero(removed.any(axis=1)).tolist():
+            mask = row_masks(removed[row])[0]
+            self.occupancy[row] &= ~mask
+            self.row_counts[row] -= bin(mask).count("1")
+        self.update_heights(removed.any(axis=0))
+
+    # Method used for checking whether the cell with given row and column indexes
+    # is occupied by a tile or empty
+    def is_occupied(self, row, col):
+        if not self.is_inside(row, col):
+            return False
+        return self.cells[row, col] != 0
+
+    # Checks whether a tetromino given as row bitmasks (see engine.cell_masks) can be
+    # on the board with the bottom left corner of its tile matrix on (x, y): no
+    # tile is out of the sides or the bottom of the board and no tile overlaps a
+    # placed tile. Tiles above the board are allowed. Each row is checked by
+    # shifting its bitmask to the column x and ANDing it with the occupied cells
+    def fits(self, piece_rows, x, y):
+        for index, mask in enumerate(piece_rows):
+            if not mask:
+                continue
+            if x >= 0:
+                shifted = mask << x
+            elif mask & ((1 << -x) - 1):
+                return False  # out of the left side
+            else:
+                shifted = mask >> -x
+            row = y + index
+            if shifted & ~self.full_mask or row < 0:
+                return False  # out of the right side or the bottom
+            if row < self.grid_height and shifted & self.occupancy[row]:
+                return False
+        return True
+
+    # Returns the lowest y of the bottom left corner that a tetromino given as row
+    # bitmasks and bottom profile (see engine.bottom_profile) reaches when it is
+    # dropped straight down from (x, y). When the tetromino is above the topmost
+    # tile of each of its columns it lands on the first of them it touches, which
+    # is found from the column heights without scanning the board. Otherwise (it
+    # has been moved under a tile) it is moved down one row at a time
+    def landing_y(self, piece_rows, bottoms, x, y):
+        landing = max(int(self.heights[x + col]) - row for col, row in bottoms)
+        if landing <= y:
+            return landing
+        while self.fits(piece_rows, x, y - 1):
+            y -= 1
+        return y
+
+    # Method used for checking whether the cell with given row and column indexes
+    # is inside the board or not
+    def is_inside(self, row, col):
+        return 0 <= row < self.grid_height and 0 <= col < self.grid_width
+
+    # Merges each tile with the equal numbered tile above it, bottom to top, as a
+    # single pass. Each row is handled for all the columns at once. Returns the
+    # score gained by the merges (0 if no merge is performed)
+    def check_merging(self):
+        cells = self.cells
+        score = 0
+        for a in range(self.grid_height - 1):
+            # columns where the tile in row a has an equal numbered tile above it
+            merging = (cells[a] != 0) & (cells[a] == cells[a + 1])
+            if merging.any():
+                cells[a + 1, merging] = 0
+                cells[a, merging] += 1
+                score += int((1 << cells[a, merging].astype(np.int64)).sum())
+                mask = row_masks(merging)[0]
+                self.occupancy[a + 1] &= ~mask
+                self.row_counts[a + 1] -= bin(mask).count("1")
+                self.update_heights(merging)
+        return score
+
+    # Merges the tiles until there is no tile to merge (see merge_cascade).
+    # Returns the score gained by the merges
+    def merge_cascade(self):
+        removed = np.zeros(self.cells.shape, dtype=bool)
+        score = int(merge_cascade(self.cells, removed))
+        if score:
+            self.remove_from_rows(removed)
+        return score
+
+    # Checks each row if it is completely filled with tiles by comparing its tile
+    # count with the width, returns each row in a boolean array
+    def is_full(self):
+        return self.row_counts == self.grid_width
+
+    # Removes the row with the given index and slides down each row above it
+    def slide_down(self, index):
+        self.cells[index:-1] = self.cells[index + 1:]
+        self.cells[-1] = 0
+        self.row_counts[index:-1] = self.row_counts[index + 1:]
+        self.row_counts[-1] = 0
+        del self.occupancy[index]
+        self.occupancy.append(0)
+        self.update_heights()
+
+    # Removes all completely filled rows at once by moving the remaining rows
+    # down in their order and emptying the rows left on the top. Returns the
+    # number of removed rows and the score gained by the numbers on them
+    def clear_full_rows(self):
+        row_count = self.is_full()
+        num_rows = int(row_count.sum())
+        if num_rows == 0:
+            return 0, 0
+        score = int((1 << self.cells[row_count].astype(np.int64)).sum())
+        remaining = ~row_count
+        num_remaining = self.grid_height - num_rows
+        self.cells[:num_remaining] = self.cells[remaining]
+        self.cells[num_remaining:] = 0
+        self.row_counts[:num_remaining] = self.row_counts[remaining]
+        self.row_counts[num_remaining:] = 0
+        self.occupancy = [mask for mask, full in zip(self.occupancy, row_count) if not full]
+        self.occupancy += [0] * num_rows
+        self.update_heights()
+        return num_rows, score
+
+    # Assigns labels to each tile using 4-component labeling (see
+    # labeling.connected_component_labeling). Returns the labels array and the
+    # number of different labels
+    def connected_component_labeling(self, fast=True):
+        return connected_component_labeling(self.cells != 0, fast)
+
+    # Returns the row bitmasks of the tiles which are connected to the bottommost
+    # row through the other tiles and of the free tiles which are not. The
+    # supported tiles are marked by a single flood from the bottommost row over the
+    # row bitmasks (see find_supported), so no labeling is needed
+    def supported_rows(self):
+        occupied = self.occupancy
+        supported = find_supported(occupied)
+        return supported, [occupied[row] & ~supported[row] for row in range(self.grid_height)]
+
+    # Finds each tile which is not connected to the bottommost row through the
+    # other tiles (see supported_rows). Returns a boolean array of the free tiles
+    # and their number
+    def find_free_tiles(self):
+        free_rows = self.supported_rows()[1]
+        free_tiles = mask_rows(free_rows, self.grid_width)
+        return free_tiles, sum(bin(free).count("1") for free in free_rows)
+
+    # Drops down the free tiles until there is no free tile, giving the same
+    # board as repeatedly finding the free tiles and sending them one unit down.
+    # All the floating components fall together and each one stops when it
+    # touches the bottommost row or any supported tile (from below or from a
+    # side), so the components are landed in the order of their fall distances
+    # and each one is moved once. Returns the number of dropped tiles
+    def drop_free_tiles(self):
+        supported, free_rows = self.supported_rows()
+        if not any(free_rows):
+            return 0
+        labels, num_labels = connected_component_labeling(mask_rows(free_rows, self.grid_width))
+        # row bitmasks of each floating component as {row: mask}
+        components = [{} for label in range(num_labels)]
+        rows, cols = np.nonzero(labels)
+        for row, col, label in zip(rows.tolist(), cols.tolist(), labels[rows, cols].tolist()):
+            components[label - 1][row] = components[label - 1].get(row, 0) | (1 << col)
+        fallen = 0  # the distance fallen by the components which are still falling
+        landed = []
+        while components:
+            near = self.near_masks(supported)
+            distances = [self.fall_distance(component, near, fallen) for component in components]
+            step = min(distances)
+            fallen += step
+            falling = []
+            for component, distance in zip(components, distances):
+                if distance != step:
+                    falling.append(component)
+                    continue
+                # the component lands and supports the components still falling
+                for row, mask in component.items():
+                    supported[row - fallen] |= mask
+                landed.append((component, fallen))
+            components = falling
+        # move the tiles of each component by its fall distance
+        cells = np.where(mask_rows(free_rows, self.grid_width), 0, self.cells)
+        for component, distance in landed:
+            moving = mask_rows(list(component.values()), self.grid_width)
+            for index, row in enumerate(component):
+                cells[row - distance, moving[index]] = self.cells[row, moving[index]]
+        self.cells[:] = cells
+        # the supported cells are now all the occupied cells
+        self.occupancy = supported
+        self.row_counts = np.array([bin(mask).count("1") for mask in supported])
+        self.update_heights()
+        return sum(bin(free).count("1") for free in free_rows)
+
+    # Returns the row bitmasks of the given supported cells together with their
+    # 4 neighbors, the cells where a falling tile stops
+    def near_masks(self, supported):
+        full = self.full_mask
+        near = []
+        for row in range(self.grid_height):
+            mask = supported[row] | (supported[row] << 1) | (supported[row] >> 1)
+            if row > 0:
+                mask |= supported[row - 1]
+            if row + 1 < self.grid_height:
+                mask |= supported[row + 1]
+            near.append(mask & full)
+        return near
+
+    # Returns how many more rows the given component (fallen the given distance
+    # already) falls before it touches the bottommost row or a cell in near
+    def fall_distance(self, component, near, fallen):
+        lowest = min(component) - fallen
+        for distance in range(1, lowest):
+            for row, mask in component.items():
+                if mask & near[row - fallen - distance]:
+                    return distance
+        return lowest
+
+    # Takes the boolean array of free tiles, sends them one unit down
+    def move_free_tiles(self, free_tiles):
+        moved = np.where(free_tiles, self.cells, 0)
+        self.cells[free_tiles] = 0
+        self.cells[:-1] |= moved[1:]
+        for row, mask in enumerate(row_masks(free_tiles)):
+            if mask:
+                num_moved = bin(mask).count("1")
+                self.occupancy[row] &= ~mask
+                self.occupancy[row - 1] |= mask
+                self.row_counts[row] -= num_moved
+                self.row_counts[row - 1] += num_moved
+        self.update_heights(free_tiles.any(axis=0))
@@ -9,9 +9,12 @@ objects.
 
 class Color:
     """
-    A Color object models an RGB color.
+    A Color object models an RGB color. Color objects are immutable
+    and hashable; two Color objects with the same components are equal.
     """
 
+    __slots__ = ('_r', '_g', '_b', '_hash')
+
     #-------------------------------------------------------------------
 
     def __init__(self, r=0, g=0, b=0):
@@ -19,9 +22,47 @@ class Color:
         Construct self such that it has the given red (r),
         green (g), and blue (b) components.
         """
-        self._r = r  # Red component
-        self._g = g  # Green component
-        self._b = b  # Blue component
+        object.__setattr__(self, '_r', r)  # Red component
+        object.__setattr__(self, '_g', g)  # Green component
+        object.__setattr__(self, '_b', b)  # Blue component
+        object.__setattr__(self, '_hash', hash((r, g, b)))
+
+    #-------------------------------------------------------------------
+
+    def __setattr__(self, name, value):
+        """
+        Raise an AttributeError, since self is immutable.
+        """
+        raise AttributeError('Color objects are immutable')
+
+    #-------------------------------------------------------------------
+
+    def __eq__(self, other):
+        """
+        Return True if other is a Color with the same components as
+        self, and False otherwise.
+        """
+        if not isinstance(other, Color):
+            return NotImplemented
+        return (self._r == other._r and self._g == other._g and
+                self._b == other._b)
+
+    #-------------------------------------------------------------------
+
+    def __hash__(self):
+        """
+        Return the hash of the components of self.
+        """
+        return self._hash
+
+    #-------------------------------------------------------------------
+
+    def __reduce__(self):
+        """
+        Return the constructor and the components of self, used for
+        copying and pickling self.
+        """
+        return (Color, (self._r, self._g, self._b))
 
     #-------------------------------------------------------------------
 
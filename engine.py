@@ -0,0 +1,327 @@
+import random  # used for creating tetrominoes with random types/positions/numbers
+from collections import deque  # keeps the upcoming pieces of a PieceQueue
+from board import ExponentBoard  # keeps the placed tiles as exponents of their numbers
+
+# Shapes of the tetrominoes in their initial orientation. Each type is mapped to
+# n (number of rows = number of columns of its tile matrix) and the occupied
+# cells as (column_index, row_index) pairs where row 0 is the top row
+TETROMINO_SHAPES = {
+    'I': (4, ((1, 0), (1, 1), (1, 2), (1, 3))),
+    'O': (2, ((0, 0), (1, 0), (0, 1), (1, 1))),
+    'Z': (3, ((0, 0), (1, 0), (1, 1), (2, 1))),
+    'J': (3, ((0, 0), (2, 0), (1, 0), (2, 1))),
+    'L': (3, ((0, 0), (2, 0), (1, 0), (0, 1))),
+    'T': (3, ((0, 0), (2, 0), (1, 0), (1, 1))),
+    'S': (3, ((0, 1), (2, 0), (1, 0), (1, 1))),
+}
+TETROMINO_TYPES = ('I', 'O', 'Z', 'J', 'L', 'T', 'S')
+# Numbers which a newly created tile can take
+TILE_NUMBERS = (2, 4)
+# Actions accepted by Engine.step (None only applies the gravity)
+ACTIONS = (None, "left", "right", "down", "rotate", "drop")
+
+
+# Returns the given cells of an n x n tile matrix rotated clockwise by using
+# (x,y) = (y, n - 1 -x), keeping the order of the tiles
+def rotate_cells(n, cells):
+    return tuple((n - 1 - row, col) for col, row in cells)
+
+
+# Returns the row bitmasks of the given cells of an n x n tile matrix from its
+# bottom row to its top row, where bit col of a row is set if the cell in column
+# col is occupied (see ExponentBoard.fits)
+def cell_masks(n, cells):
+    masks = [0] * n
+    for col, row in cells:
+        masks[n - 1 - row] |= 1 << col
+    return tuple(masks)
+
+
+# Returns the bottom profile of the given cells of an n x n tile matrix: the
+# (column_index, row) of the lowest cell in each occupied column, where rows are
+# counted upwards from the bottom row of the tile matrix
+def bottom_profile(n, cells):
+    lowest = {}
+    for col, row in cells:
+        lowest[col] = min(lowest.get(col, n), n - 1 - row)
+    return tuple(sorted(lowest.items()))
+
+
+# Creates the tables of all four orientations of each tetromino type
+def create_rotation_tables():
+    rotations, masks, columns, bottoms = {}, {}, {}, {}
+    for type, (n, cells) in TETROMINO_SHAPES.items():
+        orientations = [tuple(cells)]
+        for k in range(3):
+            orientations.append(rotate_cells(n, orientations[-1]))
+        rotations[type] = tuple(orientations)
+        masks[type] = tuple(cell_masks(n, cells) for cells in orientations)
+        columns[type] = tuple((min(col for col, row in cells), max(col for col, row in cells))
+                              for cells in orientations)
+        bottoms[type] = tuple(bottom_profile(n, cells) for cells in orientations)
+    return rotations, masks, columns, bottoms
+
+
+# Orientations of each type, clockwise from the initial one. ROTATIONS[type][k][i]
+# is the (column_index, row_index) cell of tile i of the tetromino in orientation
+# k, ROTATION_MASKS[type][k] is its row bitmasks and ROTATION_COLUMNS[type][k] is
+# its leftmost and rightmost occupied columns, ROTATION_BOTTOMS[type][k] is its
+# bottom profile (see bottom_profile)
+ROTATIONS, ROTATION_MASKS, ROTATION_COLUMNS, ROTATION_BOTTOMS = create_rotation_tables()
+# Shifts (dx, dy) tried in order when a rotated tetromino does not fit where it
+# is rotated, after it is pushed back inside the sides of the game grid
+WALL_KICKS = ((0, 0), (-1, 0), (1, 0))
+
+
+# Finds where the tetromino of the given type in the given orientation with the
+# bottom left corner of its tile matrix on (x, y) can be rotated clockwise. It is
+# pushed back inside the sides of a grid with the given width and the wall kicks
+# are tried in order by using the given fits function (see ExponentBoard.fits).
+# Returns the new orientation and bottom left corner, or None if it does not fit
+def rotate_piece(fits, type, rotation, x, y, grid_w, kicks=WALL_KICKS):
+    rotation = (rotation + 1) % 4
+    leftmost, rightmost = ROTATION_COLUMNS[type][rotation]
+    if x + leftmost < 0:
+        x = -leftmost
+    elif x + rightmost >= grid_w:
+        x = grid_w - 1 - rightmost
+    for dx, dy in kicks:
+        if fits(ROTATION_MASKS[type][rotation], x + dx, y + dy):
+            return rotation, x + dx, y + dy
+    return None
+
+
+# Returns the (x, y, number) values of each tile of the tetromino of the given
+# type in the given orientation with the bottom left corner of its tile matrix on
+# (x, y), where numbers are the numbers on its tiles
+def tetromino_tiles(type, rotation, x, y, numbers):
+    n = TETROMINO_SHAPES[type][0]
+    return [(x + col, y + (n - 1) - row, number)
+            for (col, row), number in zip(ROTATIONS[type][rotation], numbers)]
+
+
+# Generates an endless stream of tetromino types chosen by the given
+# random.Random. When bag is True the types are dealt in bags holding each of the
+# seven types once in a random order (7-bag randomization)
+def tetromino_types(rng, bag=False):
+    while True:
+        if bag:
+            types = list(TETROMINO_TYPES)
+            rng.shuffle(types)
+            yield from types
+        else:
+            yield rng.choice(TETROMINO_TYPES)
+
+
+# Class used for queueing the tetrominoes to enter the game grid. The pieces are
+# created lazily, one at a time, by calling make_piece with each type from the
+# stream of types (the types themselves are the pieces if it is not given) and
+# lookahead upcoming pieces are kept ready for previews. The queue has its own
+# random.Random, so the seed fully determines the stream of pieces
+class PieceQueue:
+    # Constructor that creates the queue with its first lookahead pieces, at
+    # least one upcoming piece is kept (the next piece shown to the player)
+    def __init__(self, make_piece=None, lookahead=1, bag=False, seed=None):
+        if lookahead < 1:
+            raise ValueError("lookahead must be at least 1: " + str(lookahead))
+        self.random = random.Random(seed)
+        self.pieces = map(make_piece or str, tetromino_types(self.random, bag))
+        self.upcoming = deque(next(self.pieces) for i in range(lookahead))
+
+    # Returns the next piece and creates a new upcoming piece in its place
+    def next(self):
+        self.upcoming.append(next(self.pieces))
+        return self.upcoming.popleft()
+
+    # Returns the upcoming piece with the given index (0 is the next piece)
+    # without removing it from the queue
+    def peek(self, index=0):
+        return self.upcoming[index]
+
+
+# Class used for reporting what settling a board has changed
+class SettleReport:
+    # Constructor that creates an empty report
+    def __init__(self):
+        self.merges = 0  # number of merged tile pairs
+        self.rows_cleared = 0  # number of removed full rows
+        self.tiles_dropped = 0  # number of free tiles dropped down
+        self.score = 0  # score gained by the merges and the removed rows
+        self.iterations = 0  # number of merge, clear and drop rounds
+
+    # Returns the string equivalent of the report
+    def __str__(self):
+        return ("merges: " + str(self.merges) + ", rows cleared: " + str(self.rows_cleared) +
+                ", tiles dropped: " + str(self.tiles_dropped) + ", score: " + str(self.score) +
+                ", iterations: " + str(self.iterations))
+
+
+# Applies the rules to the given ExponentBoard after a tetromino is placed: merges
+# the tiles, clears the full rows and drops the free tiles, repeating them until
+# a round changes nothing. Returns a SettleReport of the changes
+def settle(board):
+    report = SettleReport()
+    while True:
+        report.iterations += 1
+        # Merges available tiles until there is no tile to merge, each merge
+        # removes one tile
+        num_tiles = board.count_tiles()
+        score = board.merge_cascade()
+        merges = num_tiles - board.count_tiles()
+        # Removes the completely filled rows
+        num_rows, row_score = board.clear_full_rows()
+        # Drops down tiles that don't connect any other tiles
+        num_dropped = board.drop_free_tiles()
+        report.merges += merges
+        report.rows_cleared += num_rows
+        report.tiles_dropped += num_dropped
+        report.score += score + row_score
+        # the board is settled when nothing has changed in this round
+        if merges == 0 and num_rows == 0 and num_dropped == 0:
+            return report
+
+
+# Class used for simulating the game rules without any display or audio device,
+# so that games can be played by programs (bots, benchmarks, tests) as well
+class Engine:
+    # Constructor that creates an engine for a game grid with the given size,
+    # bag enables 7-bag randomization of the tetromino types and lookahead is the
+    # number of upcoming tetrominoes created in advance (see PieceQueue)
+    def __init__(self, grid_h=20, grid_w=12, seed=None, bag=False, lookahead=1):
+        self.grid_height = grid_h
+        self.grid_width = grid_w
+        self.bag = bag
+        self.lookahead = lookahead
+        self.reset(seed)
+
+    # Starts a new game on an empty board. Using the same seed reproduces the
+    # same sequence of tetrominoes and tile numbers
+    def reset(self, seed=None):
+        self.random = random.Random(seed)
+        # board keeps the tiles placed on the game grid
+        self.board = ExponentBoard(self.grid_height, self.grid_width)
+        self.score = 0
+        # It maintains another score information to update the speed based on the total score
+        self.last_updated = 0
+        self.game_over = False
+        # (type, numbers) of the tetrominoes, seeded from the random of the engine
+        # so that the seed of the engine determines them as well
+        self.queue = PieceQueue(self.new_piece, self.lookahead, self.bag, self.random.getrandbits(64))
+        self.spawn()
+        return self
+
+    # Plays one tick of the game: applies the given action to the current
+    # tetromino and then moves it down by 1. When it cannot go down anymore it is
+    # placed on the board, the board is settled and the next tetromino enters.
+    # Returns the score gained in this tick and whether the game is over
+    def step(self, action=None):
+        if action not in ACTIONS:
+            raise ValueError("Unknown action: " + str(action))
+        if self.game_over:
+            return 0, True
+        score = self.score
+        self.apply(action)
+        # move (drop) the tetromino down by 1 at each tick
+        if not self.move("down"):
+            self.lock()
+        return self.score - score, self.game_over
+
+    # Applies the given action (see ACTIONS) to the current tetromino without
+    # moving it down. Returns True if the tetromino has moved
+    def apply(self, action):
+        if action == "rotate":
+            return self.rotate()
+        if action == "drop":
+            self.hard_drop()
+            return True
+        if action is not None:
+            return self.move(action)
+        return False
+
+    # Places the current tetromino on the board where it has stopped and settles
+    # the board, then the next tetromino enters unless the game is over. Returns
+    # the SettleReport of the changes
+    def lock(self):
+        self.place(self.piece_tiles())
+        report = self.settle()
+        if not self.game_over:
+            self.spawn()
+        return report
+
+    # Applies the rules after a tetromino is placed (see settle) and increases
+    # the score. Returns the SettleReport of the changes
+    def settle(self):
+        report = settle(self.board)
+        self.add_score(report.score)
+        return report
+
+    # Creates the (type, numbers) of a tetromino of the given type for the queue,
+    # where numbers are the numbers on its tiles
+    def new_piece(self, type):
+        return type, tuple(self.random.choice(TILE_NUMBERS) for cell in TETROMINO_SHAPES[type][1])
+
+    # Creates the current tetromino above the game grid from the next piece in
+    # the queue
+    def spawn(self):
+        self.piece_type, self.piece_numbers = self.queue.next()
+        n = TETROMINO_SHAPES[self.piece_type][0]
+        self.piece_size = n
+        # orientation of the tetromino (see ROTATIONS)
+        self.piece_rotation = 0
+        # row bitmasks of the tetromino used for checking its moves
+        self.piece_rows = ROTATION_MASKS[self.piece_type][0]
+        # position of the bottom left corner of the tile matrix, just above the
+        # game grid with a random horizontal position
+        self.piece_x = self.random.randint(0, self.grid_width - n)
+        self.piece_y = self.grid_height
+        # type and numbers of the following tetromino, shown to the player
+        self.next_type, self.next_numbers = self.queue.peek()
+
+    # Returns the (x, y, number) values of each tile of the current tetromino
+    def piece_tiles(self):
+        return tetromino_tiles(self.piece_type, self.piece_rotation, self.piece_x, self.piece_y,
+                               self.piece_numbers)
+
+    # Moves the current tetromino in the given direction by 1 if it is possible
+    def move(self, direction):
+        dx, dy = {"left": (-1, 0), "right": (1, 0), "down": (0, -1)}[direction]
+        if not self.board.fits(self.piece_rows, self.piece_x + dx, self.piece_y + dy):
+            return False
+        self.piece_x += dx
+        self.piece_y += dy
+        return True
+
+    # Rotates the current tetromino clockwise by using the rotation tables (see
+    # rotate_piece), the rotation is cancelled if the rotated tetromino does not fit
+    def rotate(self, kicks=WALL_KICKS):
+        rotated = rotate_piece(self.board.fits, self.piece_type, self.piece_rotation,
+                               self.piece_x, self.piece_y, self.grid_width, kicks)
+        if rotated is None:
+            return False
+        self.piece_rotation, self.piece_x, self.piece_y = rotated
+        self.piece_rows = ROTATION_MASKS[self.piece_type][self.piece_rotation]
+        return True
+
+    # Returns the y of the bottom left corner where the current tetromino lands
+    # when it is dropped straight down (see ExponentBoard.landing_y)
+    def landing_y(self):
+        return self.board.landing_y(self.piece_rows,
+                                    ROTATION_BOTTOMS[self.piece_type][self.piece_rotation],
+                                    self.piece_x, self.piece_y)
+
+    # Moves the current tetromino straight down to where it lands, so that it is
+    # placed on the board with the gravity move of the same tick
+    def hard_drop(self):
+        self.piece_y = self.landing_y()
+
+    # Places the given (x, y, number) tiles onto the board. The game is over if
+    # any of them is out of the game grid. Returns the game_over flag
+    def place(self, tiles):
+        if not self.board.place(tiles):
+            self.game_over = True
+        return self.game_over
+
+    # Increases the total score and the score used for changing the game speed
+    def add_score(self, score):
+        self.score += score
+        self.last_updated += score
@@ -5,26 +5,30 @@ Date: 27.04.2021
 import stddraw  # the stddraw module is used as a basic graphics library
 from color import Color  # used for coloring the game grid
 import numpy as np  # fundamental Python module for scientific computing
-import copy
 from point import Point
-import pygame
-import os
 # Class used for modelling the game grid
 from tile import Tile
+from tetromino import Tetromino  # draws the current and the next tetromino of the engine
+from assets import AssetManager  # images and music loaded once
 
-# Draws the game screen
+# Draws the game screen by rendering the board of the game engine
 class GameGrid:
-    # Constructor for creating the game grid based on the given arguments
-    def __init__(self, grid_h, grid_w):
+    # Constructor for creating the game grid based on the given arguments. The
+    # given dimensions are of the whole game screen, the game itself has the size
+    # of the given engine
+    def __init__(self, grid_h, grid_w, engine, assets=None):
         # set the dimensions of the game grid as the given arguments
         self.grid_height = grid_h
         self.grid_width = grid_w
-        # create the tile matrix to store the tiles placed on the game grid
-        self.tile_matrix = np.full((grid_h, grid_w), None)
-        # the tetromino that is currently being moved on the game grid
-        self.current_tetromino = None
-        # game_over flag shows whether the game is over/completed or not
-        self.game_over = False
+        # the engine keeps the placed tiles on its board and applies the game rules,
+        # tiles are created only when they are drawn
+        self.engine = engine
+        # the images and the music of the game are loaded by the asset manager once
+        self.assets = assets if assets is not None else AssetManager()
+        # views drawing the tetromino that is currently being moved on the game
+        # grid and the following one, both kept by the engine
+        self.current_tetromino = Tetromino(self.engine)
+        self.next_tetromino = Tetromino(self.engine, is_next=True)
         # set the color used for the empty grid cells
         self.empty_cell_color = Color(15, 15, 15)
         # set the colors used for the grid lines and the grid boundaries
@@ -33,48 +37,136 @@ class GameGrid:
         # thickness values used for the grid lines and the grid boundaries
         self.line_thickness = 0.002
         self.box_thickness = 8 * self.line_thickness
-        # Keeps total game score
-        self.score = 0
+        # font family and size used for the texts on the game screen
+        self.font_family, self.font_size = "Arial", 14
+        # picture of the parts of the game screen which never change (see
+        # draw_background) and the size of the canvas in pixels it is drawn for
+        self.background = None
+        self.background_size = None
+        # what the last drawn frame has shown (see mark_changes): the tiles on the
+        # board, the cells of the current tetromino and its ghost, the texts, the
+        # next tetromino and the show count of stddraw it is shown with
+        self.shown_cells = None
+        self.shown_piece = set()
+        self.shown_texts = None
+        self.shown_next = None
+        self.shown_count = None
 
         self.pos = Point()
         # Keeps the default value of game speed
         self.game_speed = 250
-        # It maintains another score information to update the speed based on the total score.
-        self.last_updated = 0
         # Keeps number of time speed incread
         self.speed_increased_counter = 0
 
-        # Initializes the necessary variables from pygame to play background.
-        pygame.init()
-        pygame.font.init()
-        pygame.mixer.init()
+    # Keeps total game score (kept by the engine)
+    @property
+    def score(self):
+        return self.engine.score
 
-    # Method used for displaying the game grid
-    def display(self):
+    @score.setter
+    def score(self, score):
+        self.engine.score = score
+
+    # It maintains another score information to update the speed based on the total score.
+    @property
+    def last_updated(self):
+        return self.engine.last_updated
+
+    @last_updated.setter
+    def last_updated(self, last_updated):
+        self.engine.last_updated = last_updated
+
+    # game_over flag shows whether the game is over/completed or not (kept by the engine)
+    @property
+    def game_over(self):
+        return self.engine.game_over
+
+    # Height of each column (the number of rows up to its topmost tile, 0 if it is
+    # empty) as a read-only array (see ExponentBoard.heights). It is kept up to
+    # date by the board on each change, so the tiles never need to be scanned for it
+    @property
+    def heights(self):
+        return self.engine.board.heights
+
+    # Method used for drawing the game grid on the background canvas
+    def draw(self):
         # Checks if value of last_updated is > 500, if yes, increases the game speed
         self.change_speed()
-        # clear the background canvas to empty_cell_color
-        stddraw.clear(self.empty_cell_color)
+        # start from the picture of the static parts of the game screen
+        self.draw_background()
         # draw the game grid
         self.draw_grid()
-        # draw the current (active) tetromino
-        if self.current_tetromino != None and self.next_tetromino != None:
-            self.current_tetromino.draw()
-            self.next_tetromino.draw()
+        # draw the ghost of the current (active) tetromino where it would land,
+        # the current tetromino and the next one
+        self.current_tetromino.draw_ghost()
+        self.current_tetromino.draw()
+        self.next_tetromino.draw()
 
         # draw a box around the game grid
         self.draw_boundaries()
-        # show the resulting drawing with a pause duration = game_speed ms
-        stddraw.show(self.game_speed)
+        # only the changed regions are copied to the window when it is shown
+        self.mark_changes()
 
-    # Method for drawing the cells and the lines of the grid
-    def draw_grid(self):
-        # draw each cell of the game grid
-        for row in range(self.grid_height):
-            for col in range(self.grid_width):
-                # draw the tile if the grid cell is occupied by a tile
-                if self.tile_matrix[row][col] != None:
-                    self.tile_matrix[row][col].draw()
+    # Marks the regions of the canvas which have changed since the last frame (see
+    # stddraw.markDirty): the cells of the current tetromino and its ghost in the
+    # last and in this frame, the game grid if its tiles have changed, and the
+    # texts and the area of the next tetromino if they have changed. The whole
+    # canvas is marked if anything else (e.g. a menu) has been shown in between
+    def mark_changes(self):
+        cells = self.engine.board.cells
+        piece = self.current_tetromino.covered_cells()
+        next_piece = (self.engine.next_type, self.engine.next_numbers)
+        texts = (self.score, self.speed_increased_counter)
+        if self.shown_count != stddraw.showCount():
+            stddraw.markDirty(-0.5, -0.5, self.grid_width, self.grid_height)
+        else:
+            if not np.array_equal(cells, self.shown_cells):
+                stddraw.markDirty(-0.5, -0.5, self.engine.grid_width, self.grid_height)
+            for x, y in piece | self.shown_piece:
+                stddraw.markDirty(x - 0.5, y - 0.5, 1, 1)
+            if texts != self.shown_texts:
+                stddraw.markDirty(12.5, 17.5, 7, 2)
+            if next_piece != self.shown_next:
+                stddraw.markDirty(12.5, 11.5, 7, 4.5)
+        self.shown_cells = cells.copy()
+        self.shown_piece = piece
+        self.shown_texts = texts
+        self.shown_next = next_piece
+        # this frame is shown by the next show
+        self.shown_count = stddraw.showCount() + 1
+
+    # Method for drawing the static parts of the game screen: the empty cells and
+    # the lines of the grid, the stop button and the labels. They are drawn once
+    # into a picture covering the canvas, which is drawn on each frame instead.
+    # The picture is drawn again when the size of the canvas in pixels changes
+    def draw_background(self):
+        size = stddraw.pixelSize(self.grid_width, self.grid_height)
+        if self.background is None or size != self.background_size:
+            self.background = stddraw.sprite(-0.5, self.grid_width - 0.5, -0.5, self.grid_height - 0.5,
+                                             self.draw_static, transparent=False)
+            self.background_size = size
+        stddraw.picture(self.background)
+
+    # Method for drawing the static parts of the game screen (see draw_background)
+    def draw_static(self):
+        # clear the background canvas to empty_cell_color
+        stddraw.clear(self.empty_cell_color)
+
+        # draw the inner lines of the grid
+        stddraw.setPenColor(self.line_color)
+        stddraw.setPenRadius(self.line_thickness)
+        # x and y ranges for the game grid
+        start_x, end_x = -0.5, 12 - 0.5
+        start_y, end_y = -0.5, self.grid_height - 0.5
+        for x in np.arange(start_x + 1, end_x, 1):  # vertical inner lines
+            stddraw.line(x, start_y, x, end_y)
+        for y in np.arange(start_y + 1, end_y, 1):  # horizontal inner lines
+            stddraw.line(start_x, y, end_x, y)
+        stddraw.setPenRadius()  # reset the pen radius to its default value
+
+        # set the font of the texts on the game screen
+        stddraw.setFontFamily(self.font_family)
+        stddraw.setFontSize(self.font_size)
 
         # Drawing the stop button
         stddraw.setPenColor(Color(230, 79, 79))
@@ -84,23 +176,29 @@ class GameGrid:
         text_to_display = "| |"
         stddraw.text(10.8, 18.8, text_to_display)
 
+        # Label of the area showing the next tetromino
+        text_to_display = "NEXT TETROMINO"
+        stddraw.text(15.8, 16.5, text_to_display)
+        stddraw.setPenRadius()  # reset the pen radius to its default value
+
+    # Method for drawing the tiles of the grid and the texts which change
+    def draw_grid(self):
+        # draw the tile of each grid cell occupied on the board of the engine from
+        # its exponent, so no tile (or point) is created for drawing it
+        cells = self.engine.board.cells
+        rows, cols = np.nonzero(cells)
+        for row, col, exponent in zip(rows.tolist(), cols.tolist(), cells[rows, cols].tolist()):
+            Tile.draw_sprite(col, row, exponent)
+
+        # set the font of the texts on the game screen
+        stddraw.setFontFamily(self.font_family)
+        stddraw.setFontSize(self.font_size)
+
         # Draws the main score on the top right of the main game screen
         self.drawScore(self.score)
 
         # Displays total number of count how many times the speed increased
         self.display_info("Speed Increased", self.speed_increased_counter)
-
-        # draw the inner lines of the grid
-        stddraw.setPenColor(self.line_color)
-        stddraw.setPenRadius(self.line_thickness)
-
-        # x and y ranges for the game grid
-        start_x, end_x = -0.5, 12 - 0.5
-        start_y, end_y = -0.5, self.grid_height - 0.5
-        for x in np.arange(start_x + 1, end_x, 1):  # vertical inner lines
-            stddraw.line(x, start_y, x, end_y)
-        for y in np.arange(start_y + 1, end_y, 1):  # horizontal inner lines
-            stddraw.line(start_x, y, end_x, y)
         stddraw.setPenRadius()  # reset the pen radius to its default value
 
     # Method for drawing the boundaries around the game grid
@@ -121,8 +219,8 @@ class GameGrid:
         # return False if the cell is out of the grid
         if not self.is_inside(row, col):
             return False
-        # the cell is occupied by a tile if it is not None
-        return self.tile_matrix[row][col] != None
+        # the cell is occupied by a tile if its number on the board is not 0
+        return self.engine.board.is_occupied(row, col)
 
     # Method used for checking whether the cell with given row and column indexes
     # is inside the game grid or not
@@ -133,37 +231,6 @@ class GameGrid:
             return False
         return True
 
-    # Method for updating the game grid by placing the given tiles of a stopped
-    # tetromino and checking if the game is over due to having tiles above the
-    # topmost game grid row. The method returns True when the game is over and
-    # False otherwise.
-    def update_grid(self, tiles_to_place):
-        # place all the tiles of the stopped tetromino onto the game grid
-        n_rows, n_cols = len(tiles_to_place), len(tiles_to_place[0])
-        for col in range(n_cols):
-            for row in range(n_rows):
-                # place each occupied tile onto the game grid
-                if tiles_to_place[row][col] != None:
-                    pos = tiles_to_place[row][col].get_position()
-                    if self.is_inside(pos.y, pos.x):
-                        self.tile_matrix[pos.y][pos.x] = tiles_to_place[row][col]
-                    # the game is over if any placed tile is out of the game grid
-                    else:
-                        self.game_over = True
-        # return the game_over flag
-        return self.game_over
-
-    # Takes list of free tile (tiles which is not connected others), send them one unit down
-    def move_free_tiles(self, free_tiles):
-        for row in range(self.grid_height):  # excluding the bottommost row
-            for col in range(self.grid_width):
-                if free_tiles[row][col]:
-                    free_tile_copy = copy.deepcopy(self.tile_matrix[row][col])
-                    self.tile_matrix[row - 1][col] = free_tile_copy
-                    dx, dy = 0, -1  # change of the position in x and y directions
-                    self.tile_matrix[row - 1][col].move(dx, dy)
-                    self.tile_matrix[row][col] = None
-
     # Draws the main score on the top right of the main game screen
     def drawScore(self, score=0):
         stddraw.setPenRadius(150)
@@ -171,18 +238,13 @@ class GameGrid:
         text_to_display = "Score: "+str(score)
         stddraw.text(15.8, 18.8, text_to_display)
 
-    # Takes following tetromino from Game object rightside
-    def set_next(self, next_tetromino):
-        self.next_tetromino = next_tetromino
-
-    # Plays as many music as an endless number of repetitions in the background
+    # Plays as many music as an endless number of repetitions in the background,
+    # the music is loaded once and it is paused and resumed without loading it again
     def play_sound(self, stopped = False):
-        music = pygame.mixer.music.load(os.path.join('music.mp3'))
         if not stopped:
-            pygame.mixer.music.play(-1)
-            pygame.mixer.music.set_volume(0.3)
+            self.assets.play_music("music.mp3", 0.3)
         else:
-            pygame.mixer.music.pause()
+            self.assets.pause_music()
 
     # Increases the game speed according to the total score for each 500 score
     # If game speed is less than 50, speed does not change
@@ -200,7 +262,4 @@ class GameGrid:
         stddraw.setPenRadius(150)
         stddraw.setPenColor(Color(255, 255, 255))
         text_to_display = str(txt)+" x "+str(count)
-        stddraw.text(15.8, 18, text_to_display)
-
-        text_to_display = "NEXT TETROMINO"
-        stddraw.text(15.8, 16.5, text_to_display)
\ No newline at end of file
+        stddraw.text(15.8, 18, text_to_display)
\ No newline at end of file
@@ -0,0 +1,69 @@
+import numpy as np  # fundamental Python module for scientific computing
+
+# scipy is optional, its labeling is used as a fast path when it is installed
+try:
+    from scipy import ndimage
+except ImportError:
+    ndimage = None
+
+
+# Assigns labels to the occupied cells of the given boolean array using
+# 4-component labeling. Labels are consecutive values starting from 1, given in
+# the order the components are first met when the cells are scanned row by row
+# (as scipy.ndimage.label does) and 0 is used for the empty cells. When fast is
+# True and scipy is installed scipy.ndimage.label is used, otherwise the cells are
+# labeled with a disjoint-set (union-find) structure. Returns the labels array
+# and the number of different labels
+def connected_component_labeling(occupied, fast=True):
+    occupied = np.asarray(occupied, dtype=bool)
+    if fast and ndimage is not None:
+        return ndimage.label(occupied)
+    grid_h, grid_w = occupied.shape
+    cells = occupied.ravel().tolist()
+    # parent of each cell in the disjoint-set forest over the flat cell indexes,
+    # a cell whose parent is itself is the root of its set
+    parent = list(range(grid_h * grid_w))
+    rank = [0] * (grid_h * grid_w)
+
+    # Finds the root of the set of the given cell and makes each cell on the path
+    # point to the root directly (path compression)
+    def find(cell):
+        root = cell
+        while parent[root] != root:
+            root = parent[root]
+        while parent[cell] != root:
+            parent[cell], cell = root, parent[cell]
+        return root
+
+    # Joins the sets of the given cells by attaching the lower ranked root under
+    # the higher ranked one (union by rank)
+    def union(cell1, cell2):
+        root1, root2 = find(cell1), find(cell2)
+        if root1 == root2:
+            return
+        if rank[root1] < rank[root2]:
+            root1, root2 = root2, root1
+        parent[root2] = root1
+        if rank[root1] == rank[root2]:
+            rank[root1] += 1
+
+    # first pass to join each occupied cell with its occupied lower and left neighbors
+    for y in range(grid_h):
+        start = y * grid_w
+        for cell in range(start, start + grid_w):
+            if not cells[cell]:
+                continue
+            if cell != start and cells[cell - 1]:
+                union(cell, cell - 1)
+            if y != 0 and cells[cell - grid_w]:
+                union(cell, cell - grid_w)
+    # second pass to give consecutive labels to the sets in the order they are met
+    labels = [0] * (grid_h * grid_w)
+    root_labels = {}
+    for cell in range(grid_h * grid_w):
+        if cells[cell]:
+            root = find(cell)
+            if root not in root_labels:
+                root_labels[root] = len(root_labels) + 1
+            labels[cell] = root_labels[root]
+    return np.array(labels, dtype=int).reshape(grid_h, grid_w), len(root_labels)
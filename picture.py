@@ -95,3 +95,18 @@ class Picture:
         """
         pygameColor = pygame.Color(c.getRed(), c.getGreen(), c.getBlue(), 0)
         self._surface.set_at((x, y), pygameColor)
+
+    #-------------------------------------------------------------------
+
+    def convert(self):
+        """
+        Convert self to the pixel format of the window, keeping its
+        transparency if it has any, so that drawing self does not
+        convert it every time.  Do nothing if there is no window yet.
+        """
+        if pygame.display.get_surface() is None:
+            return
+        if self._surface.get_flags() & pygame.SRCALPHA:
+            self._surface = self._surface.convert_alpha()
+        else:
+            self._surface = self._surface.convert()
@@ -1,5 +1,8 @@
 # A class for representing a point as a location in 2D space
 class Point:
+   # __slots__ keeps only x and y, without a dictionary for the attributes of each point
+   __slots__ = ("x", "y")
+
    # constructor that creates a point at the given (x, y) location
    # default values for the given location are set as x = 0 and y = 0
    def __init__(self, x = 0, y = 0):
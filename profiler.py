@@ -0,0 +1,88 @@
+import time  # perf_counter_ns is used for timing the phases
+
+
+# Class used for keeping the distribution of the durations of a phase as a
+# histogram with logarithmic buckets: 8 buckets for each power of two, so a
+# percentile is off by at most 1/8 of its value while the memory used does not
+# grow with the number of durations
+class Histogram:
+    # Constructor that creates an empty histogram
+    def __init__(self):
+        self.counts = {}  # number of durations in each bucket
+        self.count = 0
+        self.total = 0
+
+    # Returns the index of the bucket of the given duration
+    @staticmethod
+    def bucket(value):
+        shift = value.bit_length() - 4
+        if shift <= 0:
+            return value
+        return (shift << 3) + (value >> shift)
+
+    # Returns the smallest duration of the bucket with the given index
+    @staticmethod
+    def bucket_start(index):
+        if index < 16:
+            return index
+        return (index % 8 + 8) << (index // 8 - 1)
+
+    # Adds the given duration to the histogram
+    def add(self, value):
+        index = Histogram.bucket(value)
+        self.counts[index] = self.counts.get(index, 0) + 1
+        self.count += 1
+        self.total += value
+
+    # Returns the duration below which the given fraction of the durations are
+    # (the start of the bucket holding it)
+    def percentile(self, fraction):
+        rank = fraction * self.count
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                return Histogram.bucket_start(index)
+        return 0
+
+
+# Class used for measuring how long each phase of the game loop takes. The loop
+# calls mark with the name of each phase as it starts, which ends the span of
+# the previous phase, so each phase costs one perf_counter_ns call. A disabled
+# profiler returns immediately from mark
+class Profiler:
+    # Constructor that creates a profiler which is enabled or disabled
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.histograms = {}  # histogram of the spans of each phase
+        self.phase = None  # phase being timed and its start time
+        self.started = 0
+
+    # Ends the span of the current phase and starts the span of the given one (no
+    # phase is timed after it if it is None)
+    def mark(self, phase=None):
+        if not self.enabled:
+            return
+        now = time.perf_counter_ns()
+        if self.phase is not None:
+            histogram = self.histograms.get(self.phase)
+            if histogram is None:
+                histogram = self.histograms[self.phase] = Histogram()
+            histogram.add(now - self.started)
+        self.phase, self.started = phase, now
+
+    # Returns the table of the number of spans, their mean and p50/p95/p99 for each
+    # phase, in microseconds
+    def report(self):
+        lines = ["%-10s %8s %10s %10s %10s %10s" % ("phase", "count", "mean us", "p50 us", "p95 us", "p99 us")]
+        for phase, histogram in self.histograms.items():
+            lines.append("%-10s %8d %10.1f %10.1f %10.1f %10.1f" % (
+                phase, histogram.count, histogram.total / histogram.count / 1000,
+                histogram.percentile(0.5) / 1000, histogram.percentile(0.95) / 1000,
+                histogram.percentile(0.99) / 1000))
+        return "\n".join(lines)
+
+    # Prints the report of the profiler if it is enabled
+    def dump(self):
+        if self.enabled:
+            print(self.report())
@@ -12,6 +12,9 @@ import os
 import sys
 import color
 import string
+import collections
+import math
+from picture import Picture
 
 os.environ['PYGAME_HIDE_SUPPORT_PROMPT'] = 'hide'
 import pygame
@@ -72,6 +75,11 @@ _ymax = None
 _fontFamily = _DEFAULT_FONT_FAMILY
 _fontSize = _DEFAULT_FONT_SIZE
 
+# Fonts loaded by _getFont, keyed by (family, size, bold) in least
+# recently used first order, holding at most _FONT_CACHE_SIZE fonts.
+_FONT_CACHE_SIZE = 32
+_fonts = collections.OrderedDict()
+
 _canvasWidth = float(_DEFAULT_CANVAS_SIZE)
 _canvasHeight = float(_DEFAULT_CANVAS_SIZE)
 _penRadius = None
@@ -81,6 +89,12 @@ _keysTyped = []
 # Has the window been created?
 _windowCreated = False
 
+# Rectangles of the background canvas marked by markDirty since the
+# last show (None if only the whole canvas can be shown), and the
+# number of times the background canvas has been shown.
+_dirtyRects = None
+_showCount = 0
+
 #-----------------------------------------------------------------------
 # Begin added by Alan J. Broder
 #-----------------------------------------------------------------------
@@ -99,15 +113,21 @@ _mousePos = None
 
 #-----------------------------------------------------------------------
 
+# pygame.Color objects converted by _pygameColor, keyed by the
+# (immutable) color.Color objects they are converted from.
+_pygameColors = {}
+
 def _pygameColor(c):
     """
     Convert c, an object of type color.Color, to an equivalent object
-    of type pygame.Color.  Return the result.
+    of type pygame.Color.  Return the result. Each color is converted
+    once and then taken from _pygameColors.
     """
-    r = c.getRed()
-    g = c.getGreen()
-    b = c.getBlue()
-    return pygame.Color(r, g, b)
+    pygameColor = _pygameColors.get(c)
+    if pygameColor is None:
+        pygameColor = pygame.Color(c.getRed(), c.getGreen(), c.getBlue())
+        _pygameColors[c] = pygameColor
+    return pygameColor
 
 #-----------------------------------------------------------------------
 
@@ -461,6 +481,24 @@ def filledPolygon(x, y):
     points.append((xScaled[0], yScaled[0]))
     pygame.draw.polygon(_surface, _pygameColor(_penColor), points, 0)
 
+def _getFont(bold=False):
+    """
+    Return the pygame font of the current font family and size, bold
+    if bold is True. Each font is looked up and loaded once and then
+    taken from the font cache, which drops the least recently used
+    font when it holds more than _FONT_CACHE_SIZE fonts.
+    """
+    key = (_fontFamily, _fontSize, bold)
+    font = _fonts.get(key)
+    if font is None:
+        font = pygame.font.SysFont(_fontFamily, _fontSize, bold)
+        _fonts[key] = font
+        if len(_fonts) > _FONT_CACHE_SIZE:
+            _fonts.popitem(last=False)
+    else:
+        _fonts.move_to_end(key)
+    return font
+
 def text(x, y, s):
     """
     Draw string s on the background canvas centered at (x, y).
@@ -470,7 +508,7 @@ def text(x, y, s):
     y = float(y)
     xs = _scaleX(x)
     ys = _scaleY(y)
-    font = pygame.font.SysFont(_fontFamily, _fontSize)
+    font = _getFont()
     text = font.render(s, 1, _pygameColor(_penColor))
     textpos = text.get_rect(center=(xs, ys))
     _surface.blit(text, textpos)
@@ -484,7 +522,7 @@ def boldText(x, y, s):
     y = float(y)
     xs = _scaleX(x)
     ys = _scaleY(y)
-    font = pygame.font.SysFont(_fontFamily, _fontSize, True)
+    font = _getFont(True)
     text = font.render(s, 1, _pygameColor(_penColor))
     textpos = text.get_rect(center=(xs, ys))
     _surface.blit(text, textpos)
@@ -511,6 +549,52 @@ def picture(pic, x=None, y=None):
     picSurface = pic._surface # violates encapsulation
     _surface.blit(picSurface, [xs-ws/2.0, ys-hs/2.0, ws, hs])
 
+def pixelSize(w, h):
+    """
+    Return the size in pixels, as a (width, height) pair of ints, of
+    an area that is w wide and h high on the background canvas.
+    """
+    _makeSureWindowCreated()
+    return int(round(_factorX(w))), int(round(_factorY(h)))
+
+def sprite(xmin, xmax, ymin, ymax, drawFunction, transparent=True):
+    """
+    Call drawFunction() with the drawing functions drawing on a new
+    picture instead of the background canvas, and return the picture.
+    The picture covers the area from (xmin, ymin) to (xmax, ymax) with
+    as many pixels as that area has on the background canvas, so
+    drawing it there with picture() gives the same pixels as the
+    drawing functions without calling them again. The picture is
+    transparent where nothing is drawn, unless transparent is False
+    (an opaque picture is drawn faster). The pen and the font set by
+    drawFunction() are restored afterwards.
+    """
+    global _surface
+    global _canvasWidth
+    global _canvasHeight
+    global _xmin
+    global _xmax
+    global _ymin
+    global _ymax
+    global _penColor
+    global _penRadius
+    global _fontFamily
+    global _fontSize
+    w, h = pixelSize(xmax - xmin, ymax - ymin)
+    pic = Picture(w, h)
+    if transparent:
+        pic._surface = pygame.Surface((w, h), pygame.SRCALPHA) # violates encapsulation
+    saved = (_surface, _canvasWidth, _canvasHeight, _xmin, _xmax, _ymin, _ymax,
+             _penColor, _penRadius, _fontFamily, _fontSize)
+    _surface, _canvasWidth, _canvasHeight = pic._surface, float(w), float(h)
+    _xmin, _xmax, _ymin, _ymax = float(xmin), float(xmax), float(ymin), float(ymax)
+    try:
+        drawFunction()
+    finally:
+        (_surface, _canvasWidth, _canvasHeight, _xmin, _xmax, _ymin, _ymax,
+         _penColor, _penRadius, _fontFamily, _fontSize) = saved
+    return pic
+
 def clear(c=WHITE):
     """
     Clear the background canvas to color c, where c is an
@@ -541,12 +625,48 @@ def save(f):
 
 def _show():
     """
-    Copy the background canvas to the window canvas.
+    Copy the background canvas to the window canvas. Only the
+    rectangles marked by markDirty are copied if there are any.
     """
-    _background.blit(_surface, (0, 0))
-    pygame.display.flip()
+    global _dirtyRects
+    global _showCount
+    if _dirtyRects is None:
+        _background.blit(_surface, (0, 0))
+        pygame.display.flip()
+    else:
+        for rect in _dirtyRects:
+            _background.blit(_surface, rect, rect)
+        pygame.display.update(_dirtyRects)
+        _dirtyRects = None
+    _showCount += 1
     _checkForEvents()
 
+def markDirty(x, y, w, h):
+    """
+    Mark the rectangle of width w and height h whose lower left point
+    is (x, y) as changed on the background canvas. The next show then
+    copies only the marked rectangles to the window canvas instead of
+    the whole background canvas, so everything changed since the last
+    show must be marked.
+    """
+    global _dirtyRects
+    _makeSureWindowCreated()
+    left = math.floor(_scaleX(x))
+    right = math.ceil(_scaleX(x + w))
+    top = math.floor(_scaleY(y + h))
+    bottom = math.ceil(_scaleY(y))
+    rect = pygame.Rect(left, top, right - left, bottom - top).clip(_surface.get_rect())
+    if _dirtyRects is None:
+        _dirtyRects = []
+    _dirtyRects.append(rect)
+
+def showCount():
+    """
+    Return the number of times the background canvas has been shown
+    in the window canvas.
+    """
+    return _showCount
+
 def _showAndWaitForever():
     """
     Copy the background canvas to the window canvas. Then wait
@@ -567,10 +687,22 @@ def show(msec=float('inf')):
     if msec == float('inf'):
         _showAndWaitForever()
 
+    present()
+    wait(msec)
+
+def present():
+    """
+    Copy the background canvas to the window canvas without waiting,
+    so that copying the frame can be timed apart from the wait of show.
+    """
     _makeSureWindowCreated()
     _show()
     _checkForEvents()
 
+def wait(msec):
+    """
+    Wait for msec milliseconds, checking for events meanwhile.
+    """
     # Sleep for the required time, but check for events every
     # QUANTUM seconds.
     QUANTUM = .01
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# the modules of the game are in the directory above the tests
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,57 @@
+import random
+import numpy as np
+import pytest
+from batch_grid import BatchGrid
+from engine import Engine, TETROMINO_TYPES, TETROMINO_SHAPES, TILE_NUMBERS, tetromino_tiles
+
+
+# Returns the (x, y, number) tiles of a random tetromino for the given engine,
+# skipping the tiles out of the sides of the board or on its occupied cells and
+# padded with empty (number 0) tiles to 4 tiles. Some tetrominoes are above the
+# board, which ends the game
+def random_tiles(rng, engine):
+    type = rng.choice(TETROMINO_TYPES)
+    n = TETROMINO_SHAPES[type][0]
+    x = rng.randint(-1, engine.grid_width - n + 1)
+    y = rng.randint(0, engine.grid_height)
+    numbers = [rng.choice(TILE_NUMBERS) for i in range(4)]
+    tiles = [(col, row, number) for col, row, number in tetromino_tiles(type, rng.randrange(4), x, y, numbers)
+             if 0 <= col < engine.grid_width
+             and not (row < engine.grid_height and engine.board.cells[row, col])]
+    return tiles + [(0, 0, 0)] * (4 - len(tiles))
+
+
+# Places the same tetrominoes with BatchGrid and with an Engine for each board
+# until every game is over, comparing the boards, scores and game over flags
+@pytest.mark.parametrize("seed", range(20))
+def test_batch_grid_matches_engine(seed):
+    rng = random.Random(seed)
+    num_boards, grid_h, grid_w = 6, 8, 6
+    engines = [Engine(grid_h, grid_w) for i in range(num_boards)]
+    batch = BatchGrid(num_boards, grid_h, grid_w)
+    while not batch.game_over.all():
+        tiles = [random_tiles(rng, engine) for engine in engines]
+        for engine, board_tiles in zip(engines, tiles):
+            if not engine.game_over:
+                engine.place([tile for tile in board_tiles if tile[2]])
+                engine.settle()
+        batch.place(tiles)
+        batch.settle()
+        for index, engine in enumerate(engines):
+            assert np.array_equal(batch.cells[index], engine.board.cells)
+            assert batch.scores[index] == engine.score
+            assert batch.game_over[index] == engine.game_over
+
+
+# A board whose game is over takes no more tiles and gains no more score
+def test_finished_board_is_left_unchanged():
+    batch = BatchGrid(2, 4, 3)
+    batch.place([[(0, 4, 2)], [(0, 0, 2)]])
+    batch.settle()
+    cells = batch.cells[0].copy()
+    for i in range(3):
+        batch.place([[(1, 0, 2), (2, 0, 2), (0, 0, 4)], [(1, 1, 2), (1, 2, 2), (2, 0, 4)]])
+        batch.settle()
+    assert batch.game_over.tolist() == [True, False]
+    assert np.array_equal(batch.cells[0], cells)
+    assert batch.scores[0] == 0
@@ -0,0 +1,92 @@
+import random
+import numpy as np
+import pytest
+from board import ExponentBoard
+from engine import Engine, ACTIONS
+from test_labeling import bfs_labeling
+from test_merging import assert_rows_consistent
+
+
+# Returns a board with random tiles on about the given fraction of its cells
+def random_board(rng, grid_h=12, grid_w=8, density=0.5):
+    board = ExponentBoard(grid_h, grid_w)
+    board.place([(x, y, 1 << rng.randint(1, 11)) for y in range(grid_h) for x in range(grid_w)
+                 if rng.random() < density])
+    return board
+
+
+# Returns a copy of the given board
+def copy_board(board):
+    copy = ExponentBoard(board.grid_height, board.grid_width)
+    copy.cells[:] = board.cells
+    copy.update_rows()
+    return copy
+
+
+# The free tiles are the tiles of the components which have no tile on the
+# bottommost row
+@pytest.mark.parametrize("seed", range(10))
+def test_find_free_tiles_matches_components(seed):
+    rng = random.Random(seed)
+    for i in range(50):
+        board = random_board(rng, density=rng.choice((0.3, 0.5, 0.7)))
+        labels, num_labels = bfs_labeling(board.cells != 0)
+        grounded = set(labels[0].tolist()) - {0}
+        expected = (labels != 0) & ~np.isin(labels, list(grounded))
+        free_tiles, num_free = board.find_free_tiles()
+        assert np.array_equal(free_tiles, expected)
+        assert num_free == int(expected.sum())
+
+
+# Dropping the free tiles gives the same board as repeatedly finding the free
+# tiles and sending them one unit down
+@pytest.mark.parametrize("seed", range(20))
+def test_drop_free_tiles_matches_one_row_moves(seed):
+    rng = random.Random(seed)
+    for i in range(50):
+        board = random_board(rng, density=rng.choice((0.3, 0.5, 0.7)))
+        expected = copy_board(board)
+        free_tiles, num_free = expected.find_free_tiles()
+        num_dropped = num_free
+        while num_free:
+            expected.move_free_tiles(free_tiles)
+            assert_rows_consistent(expected)
+            free_tiles, num_free = expected.find_free_tiles()
+        assert board.drop_free_tiles() == num_dropped
+        assert np.array_equal(board.cells, expected.cells)
+        assert_rows_consistent(board)
+
+
+# Clearing all the full rows at once gives the same board and score as removing
+# them one at a time with slide_down
+@pytest.mark.parametrize("seed", range(10))
+def test_clear_full_rows_matches_slide_down(seed):
+    rng = random.Random(seed)
+    for i in range(50):
+        board = random_board(rng, density=0.6)
+        # fill some random rows completely
+        for row in rng.sample(range(board.grid_height), rng.randint(0, 5)):
+            board.place([(x, row, 1 << rng.randint(1, 11)) for x in range(board.grid_width)])
+        expected = copy_board(board)
+        expected_score = 0
+        full_rows = np.flatnonzero(expected.is_full()).tolist()
+        for row in reversed(full_rows):
+            expected_score += int(sum(1 << int(e) for e in expected.cells[row]))
+            expected.slide_down(row)
+            assert_rows_consistent(expected)
+        assert board.clear_full_rows() == (len(full_rows), expected_score)
+        assert np.array_equal(board.cells, expected.cells)
+        assert_rows_consistent(board)
+
+
+# The row counts, bitmasks and column heights the board updates on each change
+# stay the ones recomputed from the cells (update_rows) through whole games
+@pytest.mark.parametrize("seed", range(5))
+def test_rows_stay_consistent_during_games(seed):
+    rng = random.Random(seed)
+    engine = Engine(20, 12, seed)
+    for tick in range(2000):
+        reward, game_over = engine.step(rng.choice(ACTIONS))
+        assert_rows_consistent(engine.board)
+        if game_over:
+            engine.reset(rng.getrandbits(64))
@@ -0,0 +1,54 @@
+import random
+from collections import deque
+import numpy as np
+import pytest
+from labeling import connected_component_labeling
+from board import ExponentBoard
+
+
+# Labels the 4-connected components of the given boolean cells with a breadth
+# first search from each unlabeled cell met row by row, giving the labels in the
+# order the components are first met
+def bfs_labeling(occupied):
+    grid_h, grid_w = occupied.shape
+    labels = np.zeros((grid_h, grid_w), dtype=int)
+    num_labels = 0
+    for row in range(grid_h):
+        for col in range(grid_w):
+            if not occupied[row, col] or labels[row, col]:
+                continue
+            num_labels += 1
+            labels[row, col] = num_labels
+            queue = deque([(row, col)])
+            while queue:
+                y, x = queue.popleft()
+                for ny, nx in ((y - 1, x), (y + 1, x), (y, x - 1), (y, x + 1)):
+                    if 0 <= ny < grid_h and 0 <= nx < grid_w and occupied[ny, nx] and not labels[ny, nx]:
+                        labels[ny, nx] = num_labels
+                        queue.append((ny, nx))
+    return labels, num_labels
+
+
+# The union-find labeling (and the scipy one when it is installed) gives the
+# same labels as the breadth first search on random grids of random sizes
+@pytest.mark.parametrize("fast", [False, True])
+@pytest.mark.parametrize("seed", range(10))
+def test_labeling_matches_bfs(seed, fast):
+    rng = random.Random(seed)
+    for i in range(50):
+        grid_h, grid_w = rng.randint(1, 20), rng.randint(1, 20)
+        occupied = np.array([[rng.random() < rng.choice((0.3, 0.5, 0.7)) for col in range(grid_w)]
+                             for row in range(grid_h)])
+        labels, num_labels = connected_component_labeling(occupied, fast)
+        expected_labels, expected_num_labels = bfs_labeling(occupied)
+        assert num_labels == expected_num_labels
+        assert np.array_equal(labels, expected_labels)
+
+
+# The board labels the components of its tiles
+def test_board_labeling():
+    board = ExponentBoard(3, 4)
+    board.place([(0, 0, 2), (1, 0, 4), (3, 0, 2), (3, 1, 8), (0, 2, 2), (1, 2, 2)])
+    labels, num_labels = board.connected_component_labeling(fast=False)
+    assert num_labels == 3
+    assert labels.tolist() == [[1, 1, 0, 2], [0, 0, 0, 2], [3, 3, 0, 0]]
@@ -0,0 +1,47 @@
+import random
+import pytest
+from board import ExponentBoard
+from engine import Engine, TETROMINO_TYPES, ROTATION_MASKS, ROTATION_BOTTOMS
+
+
+# Returns the y where the tetromino with the given row bitmasks lands when it is
+# moved down from (x, y) one row at a time
+def step_down(board, piece_rows, x, y):
+    while board.fits(piece_rows, x, y - 1):
+        y -= 1
+    return y
+
+
+# Asserts that landing_y gives the same y as stepping down for each tetromino
+# in each orientation from each position where it fits on the given board
+def assert_landing_matches_stepping(board):
+    for type in TETROMINO_TYPES:
+        for rotation in range(4):
+            piece_rows = ROTATION_MASKS[type][rotation]
+            bottoms = ROTATION_BOTTOMS[type][rotation]
+            for x in range(-3, board.grid_width):
+                for y in range(-3, board.grid_height + 1):
+                    if board.fits(piece_rows, x, y):
+                        assert board.landing_y(piece_rows, bottoms, x, y) == step_down(board, piece_rows, x, y)
+
+
+# Boards with random tiles have overhangs, where the tetromino can be under the
+# topmost tile of its columns
+@pytest.mark.parametrize("seed", range(10))
+def test_landing_y_on_random_boards(seed):
+    rng = random.Random(seed)
+    board = ExponentBoard(12, 8)
+    board.place([(x, y, 2) for y in range(12) for x in range(8) if rng.random() < rng.choice((0.1, 0.3, 0.5))])
+    assert_landing_matches_stepping(board)
+
+
+# Boards of games played by the engine, checked after every fifth placement
+@pytest.mark.parametrize("seed", range(5))
+def test_landing_y_during_games(seed):
+    engine = Engine(20, 12, seed)
+    for placement in range(30):
+        engine.step("drop")
+        if engine.game_over:
+            break
+        if placement % 5 == 4:
+            assert_landing_matches_stepping(engine.board)
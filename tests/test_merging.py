@@ -0,0 +1,65 @@
+import random
+import numpy as np
+import pytest
+from board import ExponentBoard, merge_cascade
+
+
+# Returns a board with random tiles on about the given fraction of its cells,
+# with few different numbers so that long merge chains are common
+def random_board(rng, grid_h=12, grid_w=6, density=0.7):
+    board = ExponentBoard(grid_h, grid_w)
+    board.place([(x, y, 1 << rng.randint(1, 3)) for y in range(grid_h) for x in range(grid_w)
+                 if rng.random() < density])
+    return board
+
+
+# Asserts that the row counts, bitmasks and column heights of the given board
+# are the ones recomputed from its cells
+def assert_rows_consistent(board):
+    row_counts, occupancy, heights = board.row_counts.copy(), list(board.occupancy), board.heights.copy()
+    board.update_rows()
+    assert np.array_equal(row_counts, board.row_counts)
+    assert occupancy == board.occupancy
+    assert np.array_equal(heights, board.heights)
+
+
+# A single merging pass merges each tile with the equal numbered tile right above
+# it, bottom to top, leaving the merged tiles to the next passes
+def test_check_merging_single_pass():
+    board = ExponentBoard(4, 1)
+    board.place([(0, 0, 2), (0, 1, 2), (0, 2, 4), (0, 3, 4)])
+    assert board.check_merging() == 4 + 8
+    assert board.numbers() == [[4], [0], [8], [0]]
+    assert_rows_consistent(board)
+
+
+# Merging until there is no tile to merge gives the same tiles and score as
+# repeating the single merging passes (ExponentBoard.check_merging)
+@pytest.mark.parametrize("seed", range(20))
+def test_merge_cascade_matches_repeated_passes(seed):
+    rng = random.Random(seed)
+    for i in range(50):
+        board = random_board(rng)
+        expected = ExponentBoard(board.grid_height, board.grid_width)
+        expected.cells[:] = board.cells
+        expected.update_rows()
+        expected_score = 0
+        while True:
+            score = expected.check_merging()
+            if score == 0:
+                break
+            expected_score += score
+        assert board.merge_cascade() == expected_score
+        assert np.array_equal(board.cells, expected.cells)
+        assert_rows_consistent(board)
+
+
+# merge_cascade on a stack of boards merges each of them as it does on its own
+def test_merge_cascade_on_many_boards():
+    rng = random.Random(0)
+    boards = [random_board(rng) for i in range(30)]
+    cells = np.stack([board.cells for board in boards])
+    scores = merge_cascade(cells)
+    for index, board in enumerate(boards):
+        assert scores[index] == merge_cascade(board.cells)
+        assert np.array_equal(cells[index], board.cells)
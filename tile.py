@@ -1,68 +1,94 @@
 import stddraw # the stddraw module is used as a basic graphics library
 from color import Color # used for coloring the tile and the number on it
-from point import Point # used for representing the position of the tile
-import copy as cp # the copy module is used for copying tile positions
-import math # math module that provides mathematical functions
-import random
-import numpy as np
 
 # Class used for representing numbered tiles as in 2048
 class Tile:
+   # Each tile keeps only the exponent of its number (log2 of the number) and its
+   # position, __slots__ avoids creating a dictionary for the attributes of each tile
+   __slots__ = ("exponent", "position")
+
    # Class attributes shared among all Tile objects
    # ---------------------------------------------------------------------------
    # value used for the thickness of the boxes (boundaries) around the tiles
    boundary_thickness = 0.004
    # font family and size used for displaying the tile number
    font_family, font_size = "Arial", 14
+   # background (tile) color of each exponent starting from 1 (the number 2), the
+   # last color is used for the larger numbers as well
+   palette = (Color(239, 230, 221), Color(239, 227, 205), Color(247, 178, 123), Color(247, 150, 99),
+              Color(247, 124, 90), Color(247, 93, 59), Color(239, 205, 115), Color(239, 206, 99),
+              Color(239, 198, 82), Color(238, 198, 66), Color(239, 194, 49), Color(60, 58, 51))
+   # foreground (number) color and boundary (box) color
+   foreground_color = Color(0, 100, 200)
+   boundary_color = Color(0, 100, 200)
+   # pictures of the tiles drawn once for each exponent (see draw) and the size of
+   # a grid cell in pixels which they are drawn for
+   sprites = {}
+   sprite_size = None
 
-   # Constructor that creates a tile at a given position with 2 as its number
-   def __init__(self, position = Point(0, 0)): # (0, 0) is the default position
-      # Assigns the random number of the tile 2 or 4 for initial
-      numbers = [2, 4]
-      # Sets a background color for each possible number
-      self.colors = [Color(239, 230, 221), Color(239, 227, 205), Color(247,178,123), Color(247,150,99), Color(247,124,90),
-                Color(247,93,59), Color(239,205,115), Color(239,206,99), Color(239,198,82), Color(238,198,66), Color(239,194,49), Color(60,58,51)]
-      self.num = int(np.random.choice(numbers, 1))
-      self.number = self.num
-      # set the colors of the tile
-      self.background_color = self.colors[int(math.log2(self.num))-1] # background (tile) color
-      self.foreground_color = Color(0, 100, 200) # foreground (number) color
-      self.boundary_color = Color(0, 100, 200) # boundary (box) color
+   # Constructor that creates a tile at a given position with the given number
+   # (chosen by the engine). The given position is kept by the tile without
+   # copying it, so it must not be shared with another object
+   def __init__(self, position, number):
+      self.exponent = number.bit_length() - 1
       # set the position of the tile as the given position
-      self.position = Point(position.x, position.y)
+      self.position = position
 
-   # Setter method for the position of the tile
-   def set_position(self, position):
-      # set the position of the tile as the given position
-      self.position = cp.copy(position)
+   # Number on the tile
+   @property
+   def number(self):
+      return 1 << self.exponent
+
+   @number.setter
+   def number(self, number):
+      self.exponent = number.bit_length() - 1
 
-   # Getter method for the position of the tile
-   def get_position(self):
-      # return the position of the tile
-      return cp.copy(self.position)
+   # Background (tile) color according to the number on the tile
+   @property
+   def background_color(self):
+      return Tile.palette[min(self.exponent, len(Tile.palette)) - 1]
 
    # Method for moving the tile by dx along the x axis and by dy along the y axis
    def move(self, dx, dy):
       self.position.translate(dx, dy)
 
-   # Method for drawing the tile
+   # Method for drawing the tile (see draw_sprite)
    def draw(self, position = None):
       if position is None:
           position = self.position
+      Tile.draw_sprite(position.x, position.y, self.exponent)
+
+   # Draws the tile with the given exponent centered on (x, y) without creating a
+   # tile, used for drawing the tiles kept by the engine. Each tile is drawn by
+   # using the picture of tiles with its number, which is drawn once for the size
+   # of a grid cell in pixels. All the pictures are drawn again when the cell size
+   # changes (the canvas or its scale is changed)
+   @staticmethod
+   def draw_sprite(x, y, exponent):
+      cell_size = stddraw.pixelSize(1, 1)
+      if cell_size != Tile.sprite_size:
+         Tile.sprites.clear()
+         Tile.sprite_size = cell_size
+      sprite = Tile.sprites.get(exponent)
+      if sprite is None:
+         tile = Tile(None, 1 << exponent)
+         sprite = stddraw.sprite(-0.5, 0.5, -0.5, 0.5, lambda: tile.draw_shapes(0, 0))
+         Tile.sprites[exponent] = sprite
+      stddraw.picture(sprite, x, y)
+
+   # Method for drawing the square, the box and the number of the tile centered
+   # on (x, y) with the drawing functions
+   def draw_shapes(self, x, y):
       # draw the tile as a filled square
       stddraw.setPenColor(self.background_color)
-      stddraw.filledSquare(self.position.x, self.position.y, 0.5)
+      stddraw.filledSquare(x, y, 0.5)
       # draw the bounding box of the tile as a square
-      stddraw.setPenColor(self.boundary_color)
+      stddraw.setPenColor(Tile.boundary_color)
       stddraw.setPenRadius(Tile.boundary_thickness)
-      stddraw.square(self.position.x, self.position.y, 0.5)
+      stddraw.square(x, y, 0.5)
       stddraw.setPenRadius()  # reset the pen radius to its default value
       # draw the number on the tile
-      stddraw.setPenColor(self.foreground_color)
+      stddraw.setPenColor(Tile.foreground_color)
       stddraw.setFontFamily(Tile.font_family)
       stddraw.setFontSize(Tile.font_size)
-      stddraw.boldText(self.position.x, self.position.y, str(self.number))
-
-   # Updates the background of the tile according to tile's number
-   def updateColor(self, num):
-      self.background_color = self.colors[int(math.log2(num)) - 1]
\ No newline at end of file
+      stddraw.boldText(x, y, str(self.number))